@@ -199,11 +199,21 @@ elif st.session_state.step == "finalize":
     sheets_to_remove = config['sheets'].get('remove_on_export', [])
     st.session_state.excel_mgr.remove_unwanted_sheets(sheets_to_remove)
     
-    # 2. Generate the bytes for the newly cleaned workbook
-    output_bytes = st.session_state.excel_mgr.get_download_bytes()
+    # 2. Compact styles/strings and generate the bytes for the newly cleaned workbook.
+    #    Both saves are costly, so do them once and reuse the result on Streamlit reruns.
+    if 'export_bytes' not in st.session_state:
+        compacted, size_before, compact_error = st.session_state.excel_mgr.compact_for_export()
+        st.session_state.export_bytes = compacted.getvalue()
+        st.session_state.export_report = (size_before, len(st.session_state.export_bytes), compact_error)
+    output_bytes = st.session_state.export_bytes
+    size_before, size_after, compact_error = st.session_state.export_report
     file_name = f"{st.session_state.promo_name}_Analysis.xlsx"
     
     st.success("✨ Junk sheets removed! Your workbook is clean and ready.")
+    if compact_error:
+        st.warning(f"⚠️ Could not compact the workbook, exporting it uncompacted: {compact_error}")
+    else:
+        st.caption(f"📦 Workbook size: {size_before / 1024:,.1f} KB → {size_after / 1024:,.1f} KB after compaction")
     
     st.download_button(
         label="⬇️ Download Final Workbook", 
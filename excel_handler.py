@@ -1,7 +1,75 @@
+import re
+import zipfile
 import openpyxl
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE
 from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.utils.indexed_list import IndexedList
 from io import BytesIO
 
+# openpyxl writes every string inline; these rebuild a shared strings table on export
+_INLINE_STRING_CELL = re.compile(r'<c([^>]*?) t="inlineStr"([^>]*)><is>(<t(?: [^>]*)?>[^<]*</t>)</is></c>')
+_SHARED_STRINGS_PART = "xl/sharedStrings.xml"
+_SHARED_STRINGS_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"
+_SHARED_STRINGS_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"
+_SHEET_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+# Style tables rebuilt during compaction, with how many leading default entries must stay in place
+_STYLE_TABLES = {
+    "fontId": ("_fonts", 1),
+    "fillId": ("_fills", 2),
+    "borderId": ("_borders", 1),
+    "alignmentId": ("_alignments", 1),
+    "protectionId": ("_protections", 1),
+}
+
+
+def _share_inline_strings(source):
+    """
+    Rewrites a saved workbook so repeated strings point at one shared strings table.
+    :param source: BytesIO holding the .xlsx written by openpyxl
+    :return: New BytesIO with inline strings moved into xl/sharedStrings.xml
+    """
+    strings = IndexedList()
+    total = 0
+
+    def to_shared(match):
+        nonlocal total
+        total += 1
+        idx = strings.add(match.group(3))
+        return f'<c{match.group(1)} t="s"{match.group(2)}><v>{idx}</v></c>'
+
+    output = BytesIO()
+    with zipfile.ZipFile(source) as src, zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as dst:
+        names = src.namelist()
+        if _SHARED_STRINGS_PART in names:
+            # Already has a table, nothing for us to do
+            source.seek(0)
+            return source
+
+        for name in names:
+            data = src.read(name)
+            if name.startswith("xl/worksheets/") and name.endswith(".xml"):
+                data = _INLINE_STRING_CELL.sub(to_shared, data.decode("utf-8")).encode("utf-8")
+            elif name == "[Content_Types].xml":
+                override = f'<Override PartName="/{_SHARED_STRINGS_PART}" ContentType="{_SHARED_STRINGS_CONTENT_TYPE}"/>'
+                data = data.replace(b"</Types>", override.encode("utf-8") + b"</Types>")
+            elif name == "xl/_rels/workbook.xml.rels":
+                text = data.decode("utf-8")
+                next_id = max((int(i) for i in re.findall(r'Id="rId(\d+)"', text)), default=0) + 1
+                rel = f'<Relationship Id="rId{next_id}" Type="{_SHARED_STRINGS_REL_TYPE}" Target="sharedStrings.xml"/>'
+                data = text.replace("</Relationships>", rel + "</Relationships>").encode("utf-8")
+            dst.writestr(src.getinfo(name), data, compress_type=zipfile.ZIP_DEFLATED)
+
+        items = "".join(f"<si>{t}</si>" for t in strings)
+        dst.writestr(
+            _SHARED_STRINGS_PART,
+            f'<sst xmlns="{_SHEET_MAIN_NS}" count="{total}" uniqueCount="{len(strings)}">{items}</sst>',
+        )
+
+    output.seek(0)
+    return output
+
 
 class ExcelManager:
     def __init__(self, template_path):
@@ -48,7 +116,77 @@ class ExcelManager:
         self.wb.save(output)
         output.seek(0)
         return output
-    
+
+    def compact_for_export(self):
+        """
+        Shrinks the workbook before download: interns identical styles and number formats,
+        drops styles no remaining sheet uses (e.g. from removed template sheets) and moves
+        repeated strings (article IDs, dates) into a shared strings table.
+        Sharing strings can grow an already-deflated file, so the smallest save is returned.
+        Relies on openpyxl internals, so any failure falls back to the plain save.
+        :return: (BytesIO to download, plain save size in bytes, error message or None)
+        """
+        plain = self.get_download_bytes()
+        size_before = plain.getbuffer().nbytes
+        candidates = [plain]
+        error = None
+        try:
+            self._compact_styles()
+            styled = self.get_download_bytes()
+            candidates.append(styled)
+            candidates.append(_share_inline_strings(styled))
+        except Exception as e:
+            error = str(e)
+
+        output = min(candidates, key=lambda buf: buf.getbuffer().nbytes)
+        output.seek(0)
+        return output, size_before, error
+
+    def _compact_styles(self):
+        """Rebuilds the workbook style tables from the styles still referenced by its sheets."""
+        # Collect every live StyleArray once; copy_worksheet gives each cell its own copy
+        cell_styles = {}
+        for ws in self.wb.worksheets:
+            styled = list(ws._cells.values()) + list(ws.row_dimensions.values()) + list(ws.column_dimensions.values())
+            for obj in styled:
+                if obj._style is not None:
+                    cell_styles[id(obj._style)] = obj._style
+        named_styles = {id(ns._style): ns._style for ns in self.wb._named_styles}
+        all_styles = list(cell_styles.values()) + [s for k, s in named_styles.items() if k not in cell_styles]
+
+        # Plan every remap first so a failure here leaves the workbook untouched
+        new_tables = {}
+        remaps = {id(style): {} for style in all_styles}
+        for attr, (table_name, keep) in _STYLE_TABLES.items():
+            old_table = getattr(self.wb, table_name)
+            new_table = IndexedList(old_table[:keep])
+            for style in all_styles:
+                old_id = getattr(style, attr)
+                if old_id < len(old_table):
+                    remaps[id(style)][attr] = new_table.add(old_table[old_id])
+            new_tables[table_name] = new_table
+
+        # Custom number formats are stored offset past the builtin ids
+        old_formats = self.wb._number_formats
+        new_formats = IndexedList()
+        for style in all_styles:
+            fmt_idx = style.numFmtId - BUILTIN_FORMATS_MAX_SIZE
+            if 0 <= fmt_idx < len(old_formats):
+                remaps[id(style)]["numFmtId"] = new_formats.add(old_formats[fmt_idx]) + BUILTIN_FORMATS_MAX_SIZE
+        new_tables["_number_formats"] = new_formats
+
+        # Apply
+        for style in all_styles:
+            for attr, new_id in remaps[id(style)].items():
+                setattr(style, attr, new_id)
+        for table_name, new_table in new_tables.items():
+            setattr(self.wb, table_name, new_table)
+
+        # Identical cell styles now collapse onto a single xf entry
+        self.wb._cell_styles = IndexedList([StyleArray()])
+        for style in cell_styles.values():
+            self.wb._cell_styles.add(style)
+
     def read_column(self, sheet_name, column_letter):
         try:
             ws = self.wb[sheet_name]
@@ -0,0 +1,268 @@
+"""
+Portfolio rollup of finished recap workbooks.
+
+Reads every <promo>_Analysis.xlsx (or browser re-download like "<promo>_Analysis (1).xlsx") in a folder, pulls the inputs and results out of
+each promo tab using the same configs/*.json mappings the app writes with, and saves
+one consolidated .xlsx or .parquet table.
+
+Usage:
+    python rollup.py recaps/ --template "Small Scale Recap" --output portfolio.xlsx
+"""
+import argparse
+import datetime
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import openpyxl
+import pandas as pd
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
+
+# Mapping keys that point at the SQL sheet rather than a single cell on the promo tab
+NON_TAB_MAPPINGS = {"sql_output_start", "sql_code_col", "sql_code_cell"}
+ANALYSIS_GLOB = "*_Analysis*.xlsx"
+ANALYSIS_NAME = re.compile(r"^(?P<promo>.+)_Analysis(?: \(\d+\))?\.xlsx$")
+# Sheets the app adds next to the promo tabs (raw uploads, item lists, SQL audit trail)
+AUX_SHEET_NAMES = {"Request Form"}
+AUX_SHEET_PATTERN = re.compile(r"^((TY|LY|LLY)_Items_|item_List_|sql_)")
+# Excel keeps "~$<name>" lock files next to workbooks that are open
+LOCK_FILE_PREFIX = "~$"
+
+
+def load_configs(config_dir="configs"):
+    """Reads JSON configs from disk, keyed by display name (same as the app)."""
+    configs = {}
+    for filepath in glob.glob(os.path.join(config_dir, "*.json")):
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+            configs[data['display_name']] = data
+    return configs
+
+
+def _cell_targets(config):
+    """Returns {(row, col): column_name} for every single-cell value to pull from a promo tab."""
+    targets = {}
+    for key, cell_ref in config['mappings'].items():
+        if key not in NON_TAB_MAPPINGS:
+            col, row = coordinate_from_string(cell_ref)
+            targets[(row, column_index_from_string(col))] = key
+    for key, cell_ref in config.get('sql_mappings', {}).items():
+        col, row = coordinate_from_string(cell_ref)
+        targets[(row, column_index_from_string(col))] = key
+    return targets
+
+
+def _normalise(value):
+    """Makes a cell value JSON-safe so fresh and cached results have the same types."""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    return value
+
+
+def _read_promo_tab(ws, targets, sql_start):
+    """Single streaming pass over a read-only sheet collecting mapped cells and the SQL output block."""
+    record = {name: None for name in targets.values()}
+    last_row = max(row for row, _ in targets) if targets else 0
+    max_col = max(col for _, col in targets) if targets else 1
+
+    sql_values = []
+    sql_row = sql_col = None
+    if sql_start:
+        col, sql_row = coordinate_from_string(sql_start)
+        sql_col = column_index_from_string(col)
+        max_col = max(max_col, sql_col)
+
+    sql_done = sql_row is None
+    for row_idx, row in enumerate(ws.iter_rows(min_row=1, max_col=max_col, values_only=True), 1):
+        for col_idx, value in enumerate(row, 1):
+            if (row_idx, col_idx) in targets:
+                record[targets[(row_idx, col_idx)]] = _normalise(value)
+
+        # write_vertical_array fills the block downwards, so it ends at the first blank
+        if not sql_done and row_idx >= sql_row:
+            value = row[sql_col - 1] if len(row) >= sql_col else None
+            if value is None:
+                sql_done = True
+            else:
+                sql_values.append(_normalise(value))
+
+        if sql_done and row_idx >= last_row:
+            break
+
+    for i, value in enumerate(sql_values, 1):
+        record[f"sql_output_{i}"] = value
+    return record
+
+
+def _template_sheets(config):
+    """Sheet names the config itself defines (bases, item list, SQL sheet); never promo tabs."""
+    names = set()
+    for value in config['sheets'].values():
+        names.update(value if isinstance(value, list) else [value])
+    return names
+
+
+def _is_promo_tab(sheet_name, template_sheets):
+    return (sheet_name not in template_sheets
+            and sheet_name not in AUX_SHEET_NAMES
+            and not AUX_SHEET_PATTERN.match(sheet_name))
+
+
+def _promo_name(path):
+    """Promo name from the export file name; falls back to the bare file name."""
+    match = ANALYSIS_NAME.match(os.path.basename(path))
+    return match.group("promo") if match else os.path.splitext(os.path.basename(path))[0]
+
+
+def extract_file(path, config):
+    """
+    Extracts one record per promo tab from a finished recap workbook.
+    Records only hold sheet contents; file/promo names are attached when the table is built.
+    """
+    targets = _cell_targets(config)
+    sql_start = config['mappings'].get('sql_output_start')
+    template_sheets = _template_sheets(config)
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        records = []
+        for ws in wb.worksheets:
+            if not _is_promo_tab(ws.title, template_sheets):
+                continue
+            record = {"tab": ws.title}
+            record.update(_read_promo_tab(ws, targets, sql_start))
+            records.append(record)
+        return records
+    finally:
+        wb.close()
+
+
+def _file_key(path, config):
+    """Hash of the file contents plus the config, so edited files or configs get re-read."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    digest.update(json.dumps([config['sheets'], config['mappings'], config.get('sql_mappings', {})],
+                             sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _load_cache(cache_path):
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable cache {cache_path}: {e}")
+        return {}
+
+
+def _save_cache(cache_path, cache):
+    """Writes to a temp file and swaps it in, so an interrupted run can't leave broken JSON."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def rollup(input_dir, config, output_path, cache_path=None, workers=None):
+    """
+    Builds the consolidated table for every recap in input_dir.
+    :param input_dir: Folder holding the <promo>_Analysis.xlsx files
+    :param config: Template config dict (one of configs/*.json)
+    :param output_path: Destination .xlsx or .parquet file
+    :param cache_path: JSON file with per-file results keyed by hash
+    :param workers: Process pool size (defaults to CPU count)
+    :return: The consolidated DataFrame
+    """
+    cache_path = cache_path or os.path.join(input_dir, ".rollup_cache.json")
+    cache = _load_cache(cache_path)
+
+    paths = sorted(
+        path for path in glob.glob(os.path.join(input_dir, ANALYSIS_GLOB))
+        if not os.path.basename(path).startswith(LOCK_FILE_PREFIX)
+    )
+    keys = {path: _file_key(path, config) for path in paths}
+    # Identical copies share a key, so each distinct file is read once
+    pending = {}
+    for path in paths:
+        if keys[path] not in cache:
+            pending.setdefault(keys[path], path)
+
+    failed = []
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(extract_file, path, config): path for path in pending.values()}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    records = future.result()
+                except Exception as e:
+                    # One unreadable file shouldn't lose the rest of the season
+                    print(f"Warning: Skipping {path}: {e}")
+                    failed.append(path)
+                    continue
+                if not records:
+                    # Not cached, so the file is looked at again once it is fixed
+                    print(f"Warning: No promo tabs found in {path}")
+                    failed.append(path)
+                    continue
+                cache[keys[path]] = records
+
+    # Drop entries for files that were edited or removed since the last run
+    live_keys = set(keys.values())
+    cache = {key: records for key, records in cache.items() if key in live_keys}
+    _save_cache(cache_path, cache)
+
+    print(f"Processed {len(pending) - len(failed)} new file(s), {len(paths) - len(pending)} from cache, "
+          f"{len(failed)} failed.")
+
+    rows = [
+        {"file": os.path.basename(path), "promo": _promo_name(path), **record}
+        for path in paths if keys[path] in cache
+        for record in cache[keys[path]]
+    ]
+    df = pd.DataFrame(rows)
+
+    if output_path.endswith(".parquet"):
+        # Mixed text/number columns (dates, pasted SQL values) are stored as text
+        obj_cols = df.select_dtypes("object").columns
+        df[obj_cols] = df[obj_cols].astype(str).where(df[obj_cols].notna(), None)
+        df.to_parquet(output_path, index=False)
+    else:
+        df.to_excel(output_path, index=False, sheet_name="Portfolio")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll up finished promo recap workbooks into one table.")
+    parser.add_argument("input_dir", help="Folder containing <promo>_Analysis.xlsx files")
+    parser.add_argument("--template", required=True, help="Config display_name used to build the recaps")
+    parser.add_argument("--output", default="portfolio_summary.xlsx", help="Output .xlsx or .parquet file")
+    parser.add_argument("--cache", default=None, help="Cache file (default: <input_dir>/.rollup_cache.json)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--configs-dir", default="configs", help="Folder with the template JSON configs")
+    args = parser.parse_args()
+
+    configs = load_configs(args.configs_dir)
+    if args.template not in configs:
+        parser.error(f"Unknown template '{args.template}'. Available: {', '.join(configs)}")
+
+    df = rollup(args.input_dir, configs[args.template], args.output, args.cache, args.workers)
+    print(f"Wrote {len(df)} promo tab(s) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
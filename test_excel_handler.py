@@ -0,0 +1,89 @@
+import zipfile
+
+import openpyxl
+from openpyxl.styles import Font, PatternFill
+
+from excel_handler import ExcelManager, _share_inline_strings
+
+
+def _build_template(path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "recap_main"
+    for r in range(1, 40):
+        for c in range(1, 6):
+            cell = ws.cell(row=r, column=c, value=f"ART{r % 7}" if c < 3 else r * 1.25)
+            cell.font = Font(bold=r % 2 == 0, color="FF0000")
+            cell.number_format = "0.000" if c > 3 else "General"
+    junk = wb.create_sheet("recap_r_main")
+    junk["A1"] = "template only"
+    junk["A1"].fill = PatternFill("solid", fgColor="123456")
+    junk["A1"].number_format = "#,##0.0000"
+    wb.save(path)
+
+
+def _snapshot(wb):
+    return {
+        (ws.title, cell.coordinate): (cell.value, cell.font.b, cell.font.color.rgb, cell.number_format)
+        for ws in wb.worksheets
+        for row in ws.iter_rows()
+        for cell in row
+    }
+
+
+def _build_manager(tmp_path):
+    template = tmp_path / "template.xlsx"
+    _build_template(template)
+
+    mgr = ExcelManager(template)
+    for i in range(3):
+        mgr.create_promo_tab("recap_main", f"Promo_{i}")
+        mgr.write_to_cell(f"Promo_{i}", "B3", "01/01/2026 - 01/14/2026")
+    mgr.remove_unwanted_sheets(["recap_main", "recap_r_main"])
+    return mgr
+
+
+def test_compact_for_export_round_trip(tmp_path):
+    mgr = _build_manager(tmp_path)
+
+    plain = openpyxl.load_workbook(mgr.get_download_bytes())
+    output, size_before, error = mgr.compact_for_export()
+    compacted = openpyxl.load_workbook(output)
+
+    assert error is None
+    assert _snapshot(compacted) == _snapshot(plain)
+    # Styles from the removed template sheet are gone
+    assert "#,##0.0000" not in compacted._number_formats
+    assert len(compacted._cell_styles) < len(plain._cell_styles)
+    # Never hand back something bigger than the plain save
+    assert output.getbuffer().nbytes <= size_before
+
+
+def test_share_inline_strings_rewrites_every_sheet(tmp_path):
+    mgr = _build_manager(tmp_path)
+
+    shared = _share_inline_strings(mgr.get_download_bytes())
+
+    with zipfile.ZipFile(shared) as archive:
+        names = archive.namelist()
+        sheets = [name for name in names if name.startswith("xl/worksheets/")]
+        assert "xl/sharedStrings.xml" in names
+        assert sheets
+        # If openpyxl's serialization drifts from the regex, strings would stay inline
+        for name in sheets:
+            assert b't="inlineStr"' not in archive.read(name)
+    assert _snapshot(openpyxl.load_workbook(shared)) == _snapshot(openpyxl.load_workbook(mgr.get_download_bytes()))
+
+
+def test_compact_for_export_falls_back_to_plain_save(tmp_path, monkeypatch):
+    mgr = _build_manager(tmp_path)
+
+    def broken():
+        raise AttributeError("openpyxl internals changed")
+
+    monkeypatch.setattr(mgr, "_compact_styles", broken)
+    output, size_before, error = mgr.compact_for_export()
+
+    assert error == "openpyxl internals changed"
+    assert output.getbuffer().nbytes == size_before
+    assert _snapshot(openpyxl.load_workbook(output)) == _snapshot(openpyxl.load_workbook(mgr.get_download_bytes()))
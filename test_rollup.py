@@ -0,0 +1,87 @@
+import datetime
+import json
+import os
+import shutil
+
+import openpyxl
+
+from rollup import rollup
+
+with open(os.path.join(os.path.dirname(__file__), "configs", "small_scale_recap.json")) as f:
+    CONFIG = json.load(f)
+
+
+def _write_recap(folder, promo, qualify_amt=10.0):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = f"{promo}_Qual"
+    ws["B3"] = datetime.datetime(2026, 1, 1)
+    ws["P4"] = qualify_amt
+    for i, value in enumerate([1, 2, "x"]):
+        ws[f"P{34 + i}"] = value
+    wb.create_sheet("item-List")["A1"] = "ART1"
+    path = folder / f"{promo}_Analysis.xlsx"
+    wb.save(path)
+    return path
+
+
+def test_rollup_skips_bad_and_lock_files(tmp_path):
+    _write_recap(tmp_path, "Spring")
+    (tmp_path / "~$Spring_Analysis.xlsx").write_bytes(b"lock")
+    (tmp_path / "Broken_Analysis.xlsx").write_bytes(b"not a zip")
+
+    df = rollup(tmp_path, CONFIG, str(tmp_path / "out.xlsx"), workers=2)
+
+    assert list(df["tab"]) == ["Spring_Qual"]
+    assert list(df["sql_output_3"]) == ["x"]
+    with open(tmp_path / ".rollup_cache.json") as f:
+        assert len(json.load(f)) == 1
+
+
+def test_rollup_cached_rows_match_fresh_rows(tmp_path):
+    _write_recap(tmp_path, "Spring")
+    fresh = rollup(tmp_path, CONFIG, str(tmp_path / "out.xlsx"), workers=1)
+    cached = rollup(tmp_path, CONFIG, str(tmp_path / "out.xlsx"), workers=1)
+
+    assert fresh.equals(cached)
+    assert fresh.loc[0, "ty_qualify_dates"] == "2026-01-01T00:00:00"
+
+
+def test_rollup_renamed_and_redownloaded_copies_keep_their_own_names(tmp_path):
+    spring = _write_recap(tmp_path, "Spring")
+    shutil.copy(spring, tmp_path / "Copy_Analysis.xlsx")
+    shutil.copy(spring, tmp_path / "Spring_Analysis (1).xlsx")
+
+    df = rollup(tmp_path, CONFIG, str(tmp_path / "out.xlsx"), workers=1)
+
+    assert list(df["file"]) == ["Copy_Analysis.xlsx", "Spring_Analysis (1).xlsx", "Spring_Analysis.xlsx"]
+    assert list(df["promo"]) == ["Copy", "Spring", "Spring"]
+    assert list(df["tab"]) == ["Spring_Qual"] * 3
+
+
+def test_rollup_does_not_cache_files_without_promo_tabs(tmp_path):
+    _write_recap(tmp_path, "Spring")
+    wb = openpyxl.Workbook()
+    wb.active.title = "item-List"
+    wb.save(tmp_path / "Empty_Analysis.xlsx")
+
+    df = rollup(tmp_path, CONFIG, str(tmp_path / "out.xlsx"), workers=1)
+
+    assert list(df["promo"]) == ["Spring"]
+    with open(tmp_path / ".rollup_cache.json") as f:
+        assert len(json.load(f)) == 1
+
+
+def test_rollup_prunes_stale_entries_and_recovers_from_broken_cache(tmp_path):
+    _write_recap(tmp_path, "Spring")
+    cache_path = tmp_path / ".rollup_cache.json"
+    cache_path.write_text('{"truncated": [')
+
+    rollup(tmp_path, CONFIG, str(tmp_path / "out.xlsx"), workers=1)
+    _write_recap(tmp_path, "Spring", qualify_amt=20.0)
+    df = rollup(tmp_path, CONFIG, str(tmp_path / "out.xlsx"), workers=1)
+
+    assert list(df["qualify_amt"]) == [20.0]
+    with open(cache_path) as f:
+        assert len(json.load(f)) == 1
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []